@@ -0,0 +1,279 @@
+"""Flask backend for StockSherlok: analysis endpoints + Telnyx webhook."""
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional
+
+import orjson
+from cachetools import TTLCache
+from flask import Flask, Response, request, send_file, stream_with_context
+from pydantic import BaseModel, Field, ValidationError
+
+from research_agent import ResearchAgent
+from chart_generator import create_comparison_charts
+from voice_handler import VoiceHandler
+
+app = Flask(__name__)
+
+
+def ojsonify(obj):
+    """jsonify replacement backed by orjson (also handles numpy scalars)."""
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+
+def get_payload():
+    """Parse the request body with orjson; empty/invalid bodies become {}."""
+    raw = request.get_data()
+    if not raw:
+        return {}
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {}
+
+
+class TickerPayload(BaseModel):
+    ticker: str = Field(min_length=1)
+    company_name: Optional[str] = None
+
+
+class ScanPayload(BaseModel):
+    sector: Optional[str] = None
+
+
+class MultiAnalyzePayload(BaseModel):
+    query: str = 'Find fast-growing mid-cap companies'
+    tickers: Optional[list[str]] = None
+    stream: bool = False
+
+
+def validated(model):
+    """Validate the request body against a schema before doing any real work.
+
+    Returns (payload, None) on success or (None, error response) on bad input,
+    so pathological requests are rejected in microseconds instead of after an
+    LLM round-trip.
+    """
+    try:
+        return model.model_validate(get_payload()), None
+    except ValidationError as e:
+        details = e.errors(include_url=False, include_context=False,
+                           include_input=False)
+        return None, (ojsonify({'error': 'invalid payload', 'details': details}), 400)
+
+
+research_agent = ResearchAgent(api_key=os.getenv('OPENAI_API_KEY'))
+voice_handler = VoiceHandler(api_key=os.getenv('TELNYX_API_KEY'),
+                             from_number=os.getenv('TELNYX_FROM_NUMBER'),
+                             research_agent=research_agent)
+
+# Per-ticker analysis is network-bound (OpenAI + yfinance round-trips), so
+# /api/analyze-multiple fans the work out across a shared thread pool.
+_TICKER_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Chart rendering is CPU-bound and holds the GIL through PNG encoding and
+# base64, so it runs in worker processes instead of tying up request threads.
+_CHART_POOL = ProcessPoolExecutor(max_workers=2)
+
+# Rendered PNGs, keyed by content digest and served from /api/charts/. Putting
+# a URL in the JSON instead of inline base64 shaves ~33% off the payload and
+# lets the browser/CDN cache the image. The canonical store is a spool
+# directory on disk: gunicorn runs several prefork workers with separate
+# memory, so the GET for a chart rarely lands on the worker that rendered
+# it. The TTLCache in front is only a per-worker read cache.
+_CHART_TTL = 3600
+_CHART_DIR = os.getenv('CHART_CACHE_DIR') or os.path.join(
+    tempfile.gettempdir(), 'stocksherlok-charts')
+os.makedirs(_CHART_DIR, exist_ok=True)
+_CHART_CACHE = TTLCache(maxsize=256, ttl=_CHART_TTL)
+
+
+def _chart_path(digest):
+    return os.path.join(_CHART_DIR, f'{digest}.png')
+
+
+def _prune_charts():
+    """Drop spooled charts past their TTL; best-effort across workers."""
+    cutoff = time.time() - _CHART_TTL
+    try:
+        for entry in os.scandir(_CHART_DIR):
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+    except OSError:
+        pass
+
+
+def _register_charts(charts):
+    """Swap inline base64 PNGs for cacheable /api/charts/<digest>.png URLs."""
+    for chart in charts:
+        image_base64 = chart.pop('image_base64', None)
+        if image_base64 is None:  # SVG charts ship inline as text
+            continue
+        png = base64.b64decode(image_base64)
+        digest = hashlib.sha1(png).hexdigest()
+        path = _chart_path(digest)
+        if not os.path.exists(path):
+            # Write-then-rename so a concurrent GET never sees a partial file.
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        _CHART_CACHE[digest] = png
+        chart['url'] = f'/api/charts/{digest}.png'
+    _prune_charts()
+    return charts
+
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    return ojsonify({'status': 'ok', 'service': 'stocksherlok'})
+
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    payload, error = validated(TickerPayload)
+    if error:
+        return error
+    result = research_agent.analyze_company(payload.ticker.upper(),
+                                            company_name=payload.company_name)
+    return ojsonify(result)
+
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    payload, error = validated(TickerPayload)
+    if error:
+        return error
+
+    def events():
+        # Tokens are JSON-encoded so embedded newlines cannot break SSE
+        # framing; the frontend decodes each data line and concatenates.
+        for token in research_agent.analyze_company_stream(
+                payload.ticker.upper(), company_name=payload.company_name):
+            yield b'data: ' + orjson.dumps(token) + b'\n\n'
+        yield b'data: [DONE]\n\n'
+
+    return Response(stream_with_context(events()),
+                    mimetype='text/event-stream')
+
+
+@app.route('/api/summarize', methods=['POST'])
+def summarize():
+    payload, error = validated(TickerPayload)
+    if error:
+        return error
+    result = research_agent.summarize_report(payload.ticker.upper(),
+                                             company_name=payload.company_name)
+    return ojsonify(result)
+
+
+@app.route('/api/insights', methods=['POST'])
+def insights():
+    payload, error = validated(TickerPayload)
+    if error:
+        return error
+    result = research_agent.get_actionable_insights(payload.ticker.upper())
+    return ojsonify(result)
+
+
+@app.route('/api/scan', methods=['POST'])
+def scan():
+    payload, error = validated(ScanPayload)
+    if error:
+        return error
+    result = research_agent.scan_market_signals(sector=payload.sector)
+    return ojsonify(result)
+
+
+@app.route('/api/analyze-multiple', methods=['POST'])
+def analyze_multiple():
+    payload, error = validated(MultiAnalyzePayload)
+    if error:
+        return error
+    query = payload.query
+    tickers = payload.tickers
+    if not tickers:
+        discovered = research_agent.discover_midcap_companies(limit=15)
+        tickers = [d['ticker'] for d in discovered]
+    if not tickers:
+        return ojsonify({'error': 'no tickers to analyze'}), 400
+
+    tickers = [t.upper() for t in tickers]
+    if payload.stream:
+        # NDJSON: flush each company as its analysis finishes so the frontend
+        # renders progressively instead of waiting for the whole batch.
+        return Response(stream_with_context(_stream_analyze(query, tickers)),
+                        mimetype='application/x-ndjson')
+
+    # One vectorized metrics pass, then a single JSON-mode LLM call covers
+    # both the per-company analyses and the ranking - one completion instead
+    # of N narrative calls plus a comparison call. Chart rendering
+    # (CPU-bound) overlaps with that LLM round-trip.
+    results = research_agent.batch_ticker_metrics(tickers)
+    charts_future = _CHART_POOL.submit(create_comparison_charts, results)
+    bundle = research_agent.batch_analyze_and_rank(tickers, query,
+                                                   companies=results)
+    llm_summary = bundle['ranking']
+    charts = _register_charts(charts_future.result())
+    return ojsonify({
+        'query': query,
+        'companies': results,
+        'summary': llm_summary,
+        'charts': charts,
+    })
+
+
+def _stream_analyze(query, tickers):
+    """Yield one NDJSON line per completed company, then the summary/charts."""
+    futures = {_TICKER_POOL.submit(research_agent.analyze_company, t): t
+               for t in tickers}
+    metrics_by_ticker = {m['ticker']: m
+                         for m in research_agent.batch_ticker_metrics(tickers)}
+    results = []
+    for future in as_completed(futures):
+        ticker = futures[future]
+        analysis = future.result()
+        metrics = metrics_by_ticker.get(ticker, {'ticker': ticker})
+        metrics['analysis'] = analysis.get('analysis', analysis.get('error', ''))
+        results.append(metrics)
+        yield orjson.dumps({'company': metrics}) + b'\n'
+
+    charts_future = _CHART_POOL.submit(create_comparison_charts, results)
+    llm_summary = research_agent.analyze_multiple_companies_llm(query, results)
+    yield orjson.dumps({'summary': llm_summary,
+                        'charts': _register_charts(charts_future.result())}) + b'\n'
+
+
+@app.route('/api/charts/<digest>.png', methods=['GET'])
+def chart_png(digest):
+    png = _CHART_CACHE.get(digest)
+    if png is None and digest.isalnum():  # digests are hex; no path tricks
+        try:
+            path = _chart_path(digest)
+            if os.path.getmtime(path) >= time.time() - _CHART_TTL:
+                with open(path, 'rb') as f:
+                    png = f.read()
+                _CHART_CACHE[digest] = png
+        except OSError:
+            pass
+    if png is None:
+        return ojsonify({'error': 'chart expired'}), 404
+    return send_file(io.BytesIO(png), mimetype='image/png', max_age=_CHART_TTL)
+
+
+@app.route('/webhook/telnyx', methods=['POST'])
+def telnyx_webhook():
+    result = voice_handler.handle_webhook(get_payload())
+    return ojsonify(result)
+
+
+if __name__ == '__main__':
+    # Dev server only. In production run the threaded gunicorn setup:
+    #   gunicorn -c gunicorn.conf.py app:app
+    app.run(host='0.0.0.0', port=5000,
+            debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true'))
@@ -0,0 +1,11 @@
+"""Shared pytest setup: import the Flask app (and its heavy transitive
+dependencies) once per session instead of once per test module."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app as flask_app  # noqa: E402  (needs the path entry above)
+
+flask_app.config['TESTING'] = True
@@ -0,0 +1,15 @@
+"""Gunicorn config for the StockSherlok backend.
+
+Run from backend/:  gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+workers = multiprocessing.cpu_count() * 2 + 1
+# Endpoints are network-bound (OpenAI / yfinance / Telnyx), so threaded
+# workers give the concurrency we need without an async port of the app.
+worker_class = 'gthread'
+threads = 8
+timeout = 120
+accesslog = None  # keep access logging off the hot path
@@ -0,0 +1,278 @@
+"""Numeric metrics for StockSherlok: price momentum, fundamentals and growth score."""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is optional, numpy path works
+    numba = None
+
+_NUMBA_AVAILABLE = numba is not None
+
+# Centered regressor for the 6-month trend slope. x = arange(window) is the
+# same for every ticker, so for the common 120-day window the centered x is
+# built once at import; its squared sum has the closed form n(n^2-1)/12.
+_X120 = np.arange(120, dtype=np.float64)
+_XC120 = _X120 - _X120.mean()
+
+
+def _centered_x_sq_sum(window):
+    """sum((x - x.mean())**2) for x = arange(window), in closed form."""
+    return window * (window * window - 1) / 12.0
+
+
+def _trend_regressor(window):
+    """(x - x.mean(), sum((x - x.mean())**2)) for a given slope window."""
+    if window == 120:
+        return _XC120, _centered_x_sq_sum(120)
+    x = np.arange(window, dtype=np.float64)
+    return x - x.mean(), _centered_x_sq_sum(window)
+
+
+def _price_core_numpy(closes):
+    """Vectorized (weekly, monthly, slope, volatility) from a close array."""
+    n = closes.size
+    weekly = (closes[-1] / closes[-7] - 1) * 100 if n >= 7 else 0.0
+    monthly = (closes[-1] / closes[-30] - 1) * 100 if n >= 30 else 0.0
+    slope = 0.0
+    vol = 0.0
+    if n >= 2:
+        # Closed-form least-squares slope: cov(x, y) / var(x). Equivalent to
+        # np.polyfit(x, y, 1)[0] without building a Vandermonde matrix.
+        y = closes[-120:]
+        xc, denom = _trend_regressor(y.size)
+        slope = float((xc * (y - y.mean())).sum() / denom)
+        returns = closes[1:] / closes[:-1] - 1
+        vol = float(returns.std() * 100)
+    return float(weekly), float(monthly), slope, vol
+
+
+def _price_core_loops(closes):
+    """Loop form of _price_core_numpy; numba fuses it into one pass."""
+    n = closes.shape[0]
+    weekly = 0.0
+    monthly = 0.0
+    slope = 0.0
+    vol = 0.0
+    if n >= 7:
+        weekly = (closes[-1] / closes[-7] - 1) * 100
+    if n >= 30:
+        monthly = (closes[-1] / closes[-30] - 1) * 100
+    if n >= 2:
+        # Closed-form least squares over x = 0..window-1: with the integer
+        # series sums sx = w(w-1)/2 and sxx = (w-1)w(2w-1)/6 known up front,
+        # the slope needs a single pass accumulating sy and sxy.
+        window = 120 if n > 120 else n
+        start = n - window
+        w = float(window)
+        sx = w * (w - 1.0) / 2.0
+        sxx = (w - 1.0) * w * (2.0 * w - 1.0) / 6.0
+        sy = 0.0
+        sxy = 0.0
+        for i in range(window):
+            y = closes[start + i]
+            sy += y
+            sxy += i * y
+        slope = (w * sxy - sx * sy) / (w * sxx - sx * sx)
+
+        r_mean = 0.0
+        for i in range(1, n):
+            r_mean += closes[i] / closes[i - 1] - 1
+        r_mean /= n - 1
+        var = 0.0
+        for i in range(1, n):
+            r = closes[i] / closes[i - 1] - 1 - r_mean
+            var += r * r
+        vol = (var / (n - 1)) ** 0.5 * 100
+    return weekly, monthly, slope, vol
+
+
+if _NUMBA_AVAILABLE:
+    # Compiled once (cached to disk), then the whole per-ticker computation is
+    # a single machine-code pass with no NumPy dispatch overhead.
+    _price_core = numba.njit(cache=True, fastmath=True)(_price_core_loops)
+else:
+    _price_core = _price_core_numpy
+
+
+def _compute_price_metrics(closes):
+    """Compute momentum/volatility metrics from a 1-D array of closes."""
+    if closes is None or len(closes) == 0:
+        return {'weekly_change': 0.0, 'monthly_change': 0.0,
+                'six_month_trend_slope': 0.0, 'volatility': 0.0}
+
+    # float32 storage halves memory traffic; the loop kernels accumulate
+    # their sums in float64 scalars, so precision stays comfortably inside
+    # the 2-4 decimal places the metrics are rounded to anyway.
+    closes = np.ascontiguousarray(closes, dtype=np.float32)
+    weekly, monthly, slope, vol = _price_core(closes)
+    return {
+        'weekly_change': round(weekly, 2),
+        'monthly_change': round(monthly, 2),
+        'six_month_trend_slope': round(slope, 4),
+        'volatility': round(vol, 2),
+    }
+
+
+def batch_price_metrics(close_arrays):
+    """Price metrics for N tickers in vectorized passes.
+
+    Series are grouped by length and each group stacked into its own (n, T)
+    matrix, so every ticker's slope and volatility are measured over its own
+    window. Padding shorter series to the longest (recent IPOs often have
+    far fewer rows) would dilute returns with zeros and stretch the slope
+    window across flat fill, corrupting both numbers. In the common case of
+    a batch with uniform history lengths this is still one matrix pass.
+    """
+    results = [{'weekly_change': 0.0, 'monthly_change': 0.0,
+                'six_month_trend_slope': 0.0, 'volatility': 0.0}
+               for _ in close_arrays]
+    groups = {}
+    for i, arr in enumerate(close_arrays):
+        if arr.size >= 2:
+            groups.setdefault(arr.size, []).append(i)
+
+    for t, indices in groups.items():
+        prices = np.empty((len(indices), t), dtype=np.float32)
+        for row, i in enumerate(indices):
+            prices[row] = close_arrays[i]
+
+        weekly = (prices[:, -1] / prices[:, -7] - 1) * 100 if t >= 7 else None
+        monthly = (prices[:, -1] / prices[:, -30] - 1) * 100 if t >= 30 else None
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+        vol = returns.std(axis=1) * 100
+
+        window = min(t, 120)
+        y = prices[:, -window:]
+        xc, denom = _trend_regressor(window)
+        # One GEMV across the group instead of a per-ticker fit.
+        slopes = (y - y.mean(axis=1, keepdims=True)) @ xc / denom
+
+        for row, i in enumerate(indices):
+            metrics = results[i]
+            if weekly is not None:
+                metrics['weekly_change'] = round(float(weekly[row]), 2)
+            if monthly is not None:
+                metrics['monthly_change'] = round(float(monthly[row]), 2)
+            metrics['six_month_trend_slope'] = round(float(slopes[row]), 4)
+            metrics['volatility'] = round(float(vol[row]), 2)
+    return results
+
+
+# (output key, source key) pairs for the fundamentals we score on, frozen at
+# import so the extraction is a single comprehension over a constant tuple.
+_FUND_KEYS = (
+    ('revenue_growth_yoy', 'revenue_growth'),
+    ('market_cap', 'market_cap'),
+    ('avg_volume_30d', 'avg_volume'),
+    ('profit_margins', 'profit_margins'),
+)
+
+
+def _compute_fundamental_metrics(fundamentals, _keys=_FUND_KEYS):
+    """Pull the fundamentals we score on out of the raw stock-data dict."""
+    return {out: fundamentals.get(src, 0.0) or 0.0 for out, src in _keys}
+
+
+# Normalization constants for the growth score. Each input is mapped onto
+# [0, 1] as clip((value + offset) * inv_range); the ranges are fixed, so the
+# reciprocals are precomputed once instead of re-deriving them per ticker.
+# Rows: weekly [-20,20], monthly [-50,50], revenue [-0.5,1], slope [-1,1],
+# stability (negated volatility over [0,10]).
+_SCORE_KEYS = ('weekly_change', 'monthly_change', 'revenue_growth_yoy',
+               'six_month_trend_slope', 'volatility')
+_SCORE_SIGNS = np.array([1.0, 1.0, 1.0, 1.0, -1.0])  # volatility counts against
+_SCORE_OFFSETS = np.array([20.0, 50.0, 0.5, 1.0, 10.0])
+_SCORE_INV_RANGES = np.array([1 / 40, 1 / 100, 1 / 1.5, 1 / 2, 1 / 10])
+_SCORE_WEIGHTS = np.array([0.25, 0.25, 0.25, 0.15, 0.10])
+
+
+def _compute_growth_score(metrics):
+    """Weighted 0-10 "growth score" combining momentum, growth and stability."""
+    vals = _SCORE_SIGNS * np.fromiter(
+        (metrics.get(k, 0.0) for k in _SCORE_KEYS),
+        dtype=np.float64, count=len(_SCORE_KEYS))
+    norms = np.clip((vals + _SCORE_OFFSETS) * _SCORE_INV_RANGES, 0.0, 1.0)
+    return round(float(_SCORE_WEIGHTS @ norms) * 10, 2)
+
+
+def _fused_core_impl(closes, revenue_growth):
+    """Price metrics + growth score in one compiled pass.
+
+    Calls straight into the price kernel, then folds the clip-and-weight
+    scoring in scalar form — under numba the whole thing inlines into a
+    single machine-code routine with no intermediate dicts or arrays.
+    Returns (weekly, monthly, slope, vol, score) with score already on the
+    0-10 scale (unrounded).
+    """
+    weekly, monthly, slope, vol = _price_core(closes)
+    vals = np.empty(5)
+    vals[0] = weekly
+    vals[1] = monthly
+    vals[2] = revenue_growth
+    vals[3] = slope
+    vals[4] = -vol
+    score = 0.0
+    for i in range(5):
+        t = (vals[i] + _SCORE_OFFSETS[i]) * _SCORE_INV_RANGES[i]
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+        score += _SCORE_WEIGHTS[i] * t
+    return weekly, monthly, slope, vol, score * 10.0
+
+
+if _NUMBA_AVAILABLE:
+    _fused_core = numba.njit(cache=True, fastmath=True)(_fused_core_impl)
+else:
+    _fused_core = _fused_core_impl
+
+
+def warm_jit():
+    """Compile (or load the cached) numba kernels before the first request.
+
+    Run once at import below so the one-off JIT cost is paid at process
+    startup instead of inside the first user-facing request. Both entry
+    kernels are exercised - compute_metrics dispatches to _fused_core, which
+    would otherwise still compile on first use. A no-op beyond the first
+    call, and when numba is absent this just exercises the numpy fallbacks.
+    """
+    _price_core(np.ones(130, dtype=np.float32))
+    _fused_core(np.ones(130, dtype=np.float32), 0.0)
+
+
+warm_jit()
+
+
+def compute_metrics(close, volume, fundamentals):
+    """Full metrics dict for one ticker: price action + fundamentals + score.
+
+    Takes raw 1-D close/volume arrays rather than the pandas DataFrame —
+    callers strip the columns out once at the boundary, keeping pandas
+    index-alignment overhead out of the numeric path. When volume data is
+    present the 30-day average comes from it instead of the snapshot figure.
+    The price math and scoring run as one fused kernel; the dict is
+    assembled once here at the Python boundary.
+    """
+    fund_metrics = _compute_fundamental_metrics(fundamentals)
+    if close is None or len(close) == 0:
+        metrics = _compute_price_metrics(close)
+        metrics.update(fund_metrics)
+        metrics['growth_score'] = _compute_growth_score(metrics)
+        return metrics
+
+    closes = np.ascontiguousarray(close, dtype=np.float32)
+    weekly, monthly, slope, vol, score = _fused_core(
+        closes, float(fund_metrics['revenue_growth_yoy']))
+    metrics = {
+        'weekly_change': round(float(weekly), 2),
+        'monthly_change': round(float(monthly), 2),
+        'six_month_trend_slope': round(float(slope), 4),
+        'volatility': round(float(vol), 2),
+        **fund_metrics,
+    }
+    if volume is not None and len(volume) > 0:
+        metrics['avg_volume_30d'] = float(np.asarray(volume)[-30:].mean())
+    metrics['growth_score'] = round(float(score), 2)
+    return metrics
@@ -0,0 +1,864 @@
+"""ResearchAgent: fetches market data via yfinance and asks OpenAI for growth analysis."""
+
+import asyncio
+import hashlib
+import json
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import httpx
+import numpy as np
+import openai
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+import yfinance as yf
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional
+    tiktoken = None
+
+from metrics_engine import (_compute_fundamental_metrics, _compute_growth_score,
+                            batch_price_metrics, compute_metrics)
+
+# LLM answers for a ticker barely change within minutes, so repeat calls to
+# /api/analyze, /api/summarize and /api/insights are served from a short TTL
+# cache instead of re-spending tokens on an identical prompt.
+_ANALYZE_CACHE = TTLCache(maxsize=1024, ttl=300)
+_SUMMARY_CACHE = TTLCache(maxsize=1024, ttl=300)
+_INSIGHTS_CACHE = TTLCache(maxsize=1024, ttl=300)
+
+# Second-level cache keyed by a digest of the realized prompt: whenever two
+# calls resolve to byte-identical prompts (same ticker via different methods,
+# demo/test replays), the completion is reused without an API round-trip.
+_LLM_RESPONSE_CACHE = TTLCache(maxsize=2048, ttl=300)
+
+# The mid-cap universe shifts over hours, not seconds, and 6-month price
+# history barely moves intraday — both are safe to reuse for a while.
+_UNIVERSE_CACHE = TTLCache(maxsize=4, ttl=3600)
+_HISTORY_CACHE = TTLCache(maxsize=512, ttl=900)
+
+# cachetools caches are not thread-safe, and all of the above are hit
+# concurrently from the agent's fetch pool and the app's ticker pool. One
+# shared lock guards every access (same pattern as _STOCK_DATA_LOCK below);
+# the critical sections are single dict operations, so contention is nil.
+_CACHE_LOCK = threading.Lock()
+
+# analyze/summarize/insights/metrics each independently re-fetch the same
+# ticker within one session; a short TTL on the assembled stock-data dict
+# collapses those duplicate round-trips. Guarded by a lock because fetches
+# run on the agent's thread pool.
+_STOCK_DATA_CACHE = TTLCache(maxsize=256, ttl=600)
+_STOCK_DATA_LOCK = threading.Lock()
+
+# Candidate universes, built once at import instead of per call. The midcap
+# list is a tuple so nothing can mutate the shared universe between scans.
+POTENTIAL_MIDCAP_TICKERS = (
+    'PLTR', 'CRWD', 'DDOG', 'NET', 'SNOW', 'MDB', 'ZS', 'OKTA',
+    'TWLO', 'ESTC', 'GTLB', 'S', 'PATH', 'AI', 'IONQ', 'RKLB',
+    'SYM', 'KTOS', 'AVAV', 'CRSP', 'NTLA', 'BEAM', 'RXRX', 'TEM',
+    'SOUN', 'BBAI', 'PL', 'ACHR', 'JOBY', 'LUNR',
+)
+
+SAMPLE_TICKERS = {
+    'technology': ('PLTR', 'CRWD', 'DDOG', 'NET', 'SNOW', 'MDB'),
+    'biotech': ('CRSP', 'NTLA', 'BEAM', 'RXRX', 'TEM'),
+    'robotics': ('SYM', 'KTOS', 'AVAV', 'RKLB', 'ACHR'),
+    'ai': ('AI', 'SOUN', 'BBAI', 'PATH', 'IONQ'),
+}
+
+# Prompt templates as module constants filled in via format_map: the hot
+# paths substitute into a prebuilt string instead of assembling a fresh
+# f-string (and its intermediate dict lookups) on every call.
+ANALYZE_PROMPT_TEMPLATE = """You are StockSherlok, a financial research detective.
+Analyze {company_name} ({ticker}) as a growth opportunity.
+
+Data:
+- Current Price: ${current_price}
+- Market Cap: {market_cap}
+- Sector: {sector}
+- Industry: {industry}
+- Revenue Growth (YoY): {revenue_growth}
+- Profit Margins: {profit_margins}
+- 52-Week Range: ${fifty_two_week_low} - ${fifty_two_week_high}
+- Recent 6-Month Trend: {recent_trend}
+
+Cover: growth trajectory, competitive position, key risks, and why this
+company might be flying under the radar. This is not financial advice."""
+
+SUMMARY_PROMPT_TEMPLATE = """Summarize the growth outlook of {company_name} ({ticker}) in 2-3
+plain-English sentences, suitable for reading aloud over the phone.
+Current price ${current_price}, sector
+{sector}, recent trend {recent_trend}.
+Do not give financial advice."""
+
+INSIGHTS_PROMPT_TEMPLATE = """You are StockSherlok. Give 3-5 short bullet-point insights for
+{company_name} ({ticker}):
+- Market Cap: {market_cap}
+- Revenue Growth: {revenue_growth}
+- Profit Margins: {profit_margins}
+- Recent Trend: {recent_trend}
+
+Focus on what to watch next quarter, potential catalysts and risk flags.
+This is not financial advice."""
+
+BATCH_ANALYZE_PROMPT_TEMPLATE = """You are StockSherlok. The user asked: "{query}"
+
+Here are the computed metrics for the candidate companies:
+{companies_json}
+
+Return ONLY valid JSON with this shape:
+{{"companies": [{{"ticker": "...", "analysis": "..."}}],
+  "top_3_companies": [{{"ticker": "...", "reason": "..."}}],
+  "comparison_summary": "...",
+  "spoken_summary": "..."}}
+
+Write a 2-3 sentence growth analysis for every company, then pick the 3
+strongest candidates and explain briefly why.
+This is not financial advice."""
+
+COMPARISON_PROMPT_TEMPLATE = """You are StockSherlok. The user asked: "{query}"
+
+Here are the computed metrics for the candidate companies:
+{companies_json}
+
+Return ONLY valid JSON with this shape:
+{{"top_3_companies": [{{"ticker": "...", "reason": "..."}}],
+  "comparison_summary": "...",
+  "spoken_summary": "..."}}
+
+Pick the 3 strongest growth candidates and explain briefly why.
+This is not financial advice."""
+
+
+@lru_cache(maxsize=512)
+def _cached_ticker(symbol, session=None):
+    """Reuse yf.Ticker objects per (symbol, session).
+
+    Ticker construction sets up per-object request state; repeat lookups of
+    the same symbol through the same pooled session get the existing object
+    back. The actual .info/.history results stay behind their own TTL caches
+    so data freshness is unaffected.
+    """
+    return yf.Ticker(symbol, session=session)
+
+
+class _PromptFields(dict):
+    """format_map source for the templates; missing keys render as 'N/A'."""
+
+    def __missing__(self, key):
+        return 'N/A'
+
+
+# Budget for the multi-company prompts, leaving headroom below the 8k context
+# for the completion itself. Oversized prompts fail only AFTER a full network
+# round-trip, so length is checked client-side before sending.
+_PROMPT_TOKEN_BUDGET = 7500
+_ENCODER = None
+
+
+def _count_tokens(text):
+    """Token count of a prompt, for pre-flight budget checks.
+
+    Uses tiktoken's gpt-4 encoding when available (loaded lazily, once);
+    otherwise the ~4-characters-per-token heuristic, which is plenty accurate
+    for a budget check with 500 tokens of headroom.
+    """
+    global _ENCODER
+    if tiktoken is not None and _ENCODER is None:
+        try:
+            _ENCODER = tiktoken.encoding_for_model('gpt-4')
+        except Exception:  # encoding data unavailable (e.g. offline)
+            _ENCODER = False
+    if _ENCODER:
+        return len(_ENCODER.encode(text))
+    return len(text) // 4
+
+
+def _fmt_money(value):
+    """Render a dollar amount for the prompts; non-numbers become 'N/A'.
+
+    yfinance omits marketCap for some tickers, in which case the raw value is
+    the string 'N/A' — feeding that to a ':,' format spec raises TypeError
+    and used to shunt perfectly good tickers onto the error path.
+    """
+    return f'${value:,}' if isinstance(value, (int, float)) else 'N/A'
+
+
+class ResearchAgent:
+    """The financial detective: data fetching, metrics and LLM reasoning."""
+
+    def __init__(self, api_key, client=None):
+        self.api_key = api_key
+        if client is not None:
+            # Dependency injection for tests and alternative transports: a
+            # stub here means constructing an agent never touches the network
+            # or the OpenAI SDK's cert/DNS machinery.
+            self._http_client = None
+            self.client = client
+        else:
+            # One pooled HTTP client for all LLM calls: keep-alive connections
+            # avoid paying the TCP+TLS handshake (~50-100ms) per request,
+            # which adds up when analyze-multiple issues 15+ calls.
+            self._http_client = httpx.Client(
+                timeout=30,
+                limits=httpx.Limits(max_connections=100,
+                                    max_keepalive_connections=50),
+            )
+            # The placeholder key keeps client construction working without
+            # credentials (e.g. tests); real calls still fail cleanly at
+            # request time, exactly as the module-global client did.
+            self.client = openai.OpenAI(api_key=api_key or 'not-configured',
+                                        http_client=self._http_client)
+        # Async twin for asyncio callers; owns its own pooled transport since
+        # httpx sync and async clients cannot be shared. The explicit limits
+        # keep high-concurrency gathers from exhausting the default pool.
+        self._async_http_client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+        self.async_client = openai.AsyncOpenAI(api_key=api_key or 'not-configured',
+                                               http_client=self._async_http_client)
+        # yfinance fetches are network-bound; a shared pool overlaps the
+        # round-trips so batch wall time is ~max(latency), not sum(latency).
+        self._fetch_pool = ThreadPoolExecutor(max_workers=16)
+        # One pooled session for all yfinance calls: without it every
+        # yf.Ticker pays its own TCP+TLS setup to Yahoo. Sized to the fetch
+        # pool so all 16 workers get a warm keep-alive connection.
+        self._yf_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        self._yf_session.mount('https://', adapter)
+        self._yf_session.mount('http://', adapter)
+
+    def _get_stock_data(self, ticker, include_history=False):
+        """Fetch fundamentals and recent price action for a ticker.
+
+        The 6-month history download (~130 rows of OHLCV) is only needed by
+        the metrics paths; the LLM prompts just need fundamentals and an
+        up/down trend, which previous vs current close already answers. Pass
+        include_history=True to pull the full DataFrame.
+
+        Returns a shallow copy so callers popping price_history (or adding
+        keys) never mutate the cached entry.
+        """
+        cache_key = (ticker, include_history)
+        with _STOCK_DATA_LOCK:
+            cached_data = _STOCK_DATA_CACHE.get(cache_key)
+        if cached_data is not None:
+            return dict(cached_data)
+
+        stock = _cached_ticker(ticker, self._yf_session)
+        info = stock.info
+
+        data = {
+            'ticker': ticker,
+            'company_name': info.get('longName', ticker),
+            'current_price': info.get('currentPrice', 'N/A'),
+            'market_cap': info.get('marketCap', 'N/A'),
+            'sector': info.get('sector', 'N/A'),
+            'industry': info.get('industry', 'N/A'),
+            'revenue_growth': info.get('revenueGrowth', 'N/A'),
+            'profit_margins': info.get('profitMargins', 'N/A'),
+            'avg_volume': info.get('averageVolume', 'N/A'),
+            'fifty_two_week_high': info.get('fiftyTwoWeekHigh', 'N/A'),
+            'fifty_two_week_low': info.get('fiftyTwoWeekLow', 'N/A'),
+        }
+        if include_history:
+            history_key = (ticker, date.today().isoformat())
+            with _CACHE_LOCK:
+                history = _HISTORY_CACHE.get(history_key)
+            if history is None:
+                history = stock.history(period="6mo")
+                with _CACHE_LOCK:
+                    _HISTORY_CACHE[history_key] = history
+            data['price_history'] = history
+            close = history['Close'].to_numpy()
+            if close.size:
+                data['recent_trend'] = 'up' if close[-1] > close[0] else 'down'
+            else:
+                data['recent_trend'] = 'unknown'
+        else:
+            price = self._num(info.get('currentPrice'))
+            prev = self._num(info.get('previousClose'))
+            if price and prev:
+                data['recent_trend'] = 'up' if price > prev else 'down'
+            else:
+                data['recent_trend'] = 'unknown'
+
+        with _STOCK_DATA_LOCK:
+            _STOCK_DATA_CACHE[cache_key] = data
+        return dict(data)
+
+    @staticmethod
+    def _prompt_key(prompt, max_tokens, temperature, model):
+        digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        return hashkey(digest, max_tokens, temperature, model)
+
+    @staticmethod
+    def _completion_params(prompt, max_tokens, temperature, model,
+                           response_format):
+        params = {
+            'model': model,
+            'messages': [{"role": "user", "content": prompt}],
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+        }
+        if response_format is not None:
+            params['response_format'] = response_format
+        return params
+
+    def _chat_completion(self, prompt, max_tokens, temperature,
+                         model='gpt-4', response_format=None):
+        """One chat completion, deduplicated by prompt digest."""
+        key = self._prompt_key(prompt, max_tokens, temperature, model)
+        with _CACHE_LOCK:
+            text = _LLM_RESPONSE_CACHE.get(key)
+        if text is None:
+            response = self.client.chat.completions.create(
+                **self._completion_params(prompt, max_tokens, temperature,
+                                          model, response_format))
+            text = response.choices[0].message.content
+            with _CACHE_LOCK:
+                _LLM_RESPONSE_CACHE[key] = text
+        return text
+
+    async def _achat_completion(self, prompt, max_tokens, temperature,
+                                model='gpt-4', response_format=None):
+        """Async twin of _chat_completion; shares the response cache."""
+        key = self._prompt_key(prompt, max_tokens, temperature, model)
+        with _CACHE_LOCK:
+            text = _LLM_RESPONSE_CACHE.get(key)
+        if text is None:
+            response = await self.async_client.chat.completions.create(
+                **self._completion_params(prompt, max_tokens, temperature,
+                                          model, response_format))
+            text = response.choices[0].message.content
+            with _CACHE_LOCK:
+                _LLM_RESPONSE_CACHE[key] = text
+        return text
+
+    @staticmethod
+    def _build_analyze_prompt(stock_data, ticker, name):
+        return ANALYZE_PROMPT_TEMPLATE.format_map(
+            _PromptFields(stock_data, ticker=ticker, company_name=name,
+                          market_cap=_fmt_money(stock_data.get('market_cap'))))
+
+    @staticmethod
+    def _build_summary_prompt(stock_data, ticker, name):
+        return SUMMARY_PROMPT_TEMPLATE.format_map(
+            _PromptFields(stock_data, ticker=ticker, company_name=name))
+
+    @staticmethod
+    def _build_insights_prompt(stock_data, ticker):
+        fields = _PromptFields(stock_data, ticker=ticker,
+                               market_cap=_fmt_money(stock_data.get('market_cap')))
+        fields.setdefault('company_name', ticker)
+        return INSIGHTS_PROMPT_TEMPLATE.format_map(fields)
+
+    def analyze_company(self, ticker, company_name=None, stock_data=None):
+        """Full narrative growth analysis of one company.
+
+        Callers that already fetched the ticker (e.g. full_analysis) pass
+        stock_data through to skip the duplicate yfinance round-trip.
+
+        The cache is populated manually, on success only, like the async
+        twin: a decorator would also cache the error dict from the except
+        block and serve one transient hiccup to every caller for the TTL.
+        """
+        key = hashkey(ticker, company_name)
+        with _CACHE_LOCK:
+            cached_result = _ANALYZE_CACHE.get(key)
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None
+                          else self._get_stock_data(ticker))
+            stock_data.pop('price_history', None)
+            name = company_name or stock_data.get('company_name', ticker)
+            prompt = self._build_analyze_prompt(stock_data, ticker, name)
+            result = {
+                'ticker': ticker,
+                'company_name': name,
+                'analysis': self._chat_completion(prompt, max_tokens=1500,
+                                                  temperature=0.7),
+                'stock_data': stock_data,
+            }
+        except Exception as e:
+            # Reuse whatever was fetched before the failure instead of paying
+            # a second yfinance round-trip just to decorate the error.
+            return {'ticker': ticker, 'error': str(e),
+                    'stock_data': stock_data if isinstance(stock_data, dict) else {}}
+        with _CACHE_LOCK:
+            _ANALYZE_CACHE[key] = result
+        return result
+
+    def analyze_company_stream(self, ticker, company_name=None, stock_data=None):
+        """Yield the narrative analysis token-by-token (stream=True).
+
+        Total generation time is unchanged, but the first tokens arrive in
+        ~500ms instead of after the full completion, which is what the UI's
+        perceived latency actually tracks. The structured (JSON) flows keep
+        the blocking variant since they need the whole body to parse.
+        """
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None
+                          else self._get_stock_data(ticker))
+            stock_data.pop('price_history', None)
+            name = company_name or stock_data.get('company_name', ticker)
+            prompt = self._build_analyze_prompt(stock_data, ticker, name)
+
+            response = self.client.chat.completions.create(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=1500,
+                temperature=0.7,
+                stream=True,
+            )
+            for chunk in response:
+                yield chunk.choices[0].delta.content or ''
+        except Exception as e:
+            yield f'[error] {e}'
+
+    async def aanalyze_company(self, ticker, company_name=None, stock_data=None):
+        """Async analyze_company for asyncio callers; shares the TTL cache."""
+        key = hashkey(ticker, company_name)
+        with _CACHE_LOCK:
+            cached_result = _ANALYZE_CACHE.get(key)
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None else
+                          await asyncio.to_thread(self._get_stock_data, ticker))
+            stock_data.pop('price_history', None)
+            name = company_name or stock_data.get('company_name', ticker)
+            prompt = self._build_analyze_prompt(stock_data, ticker, name)
+            result = {
+                'ticker': ticker,
+                'company_name': name,
+                'analysis': await self._achat_completion(prompt, max_tokens=1500,
+                                                         temperature=0.7),
+                'stock_data': stock_data,
+            }
+        except Exception as e:
+            return {'ticker': ticker, 'error': str(e)}
+        with _CACHE_LOCK:
+            _ANALYZE_CACHE[key] = result
+        return result
+
+    def summarize_report(self, ticker, company_name=None, stock_data=None):
+        """Short plain-English summary suitable for voice playback.
+
+        Cached manually on success only, mirroring the async twin, so a
+        transient failure is never served from the cache.
+        """
+        key = hashkey(ticker, company_name)
+        with _CACHE_LOCK:
+            cached_result = _SUMMARY_CACHE.get(key)
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None
+                          else self._get_stock_data(ticker))
+            stock_data.pop('price_history', None)
+            name = company_name or stock_data.get('company_name', ticker)
+            prompt = self._build_summary_prompt(stock_data, ticker, name)
+            result = {'ticker': ticker, 'company_name': name,
+                      'summary': self._chat_completion(prompt, max_tokens=200,
+                                                       temperature=0.5)}
+        except Exception as e:
+            return {'ticker': ticker, 'error': str(e)}
+        with _CACHE_LOCK:
+            _SUMMARY_CACHE[key] = result
+        return result
+
+    async def asummarize_report(self, ticker, company_name=None, stock_data=None):
+        """Async summarize_report; shares the TTL cache."""
+        key = hashkey(ticker, company_name)
+        with _CACHE_LOCK:
+            cached_result = _SUMMARY_CACHE.get(key)
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None else
+                          await asyncio.to_thread(self._get_stock_data, ticker))
+            stock_data.pop('price_history', None)
+            name = company_name or stock_data.get('company_name', ticker)
+            prompt = self._build_summary_prompt(stock_data, ticker, name)
+            result = {'ticker': ticker, 'company_name': name,
+                      'summary': await self._achat_completion(prompt, max_tokens=200,
+                                                              temperature=0.5)}
+        except Exception as e:
+            return {'ticker': ticker, 'error': str(e)}
+        with _CACHE_LOCK:
+            _SUMMARY_CACHE[key] = result
+        return result
+
+    def get_actionable_insights(self, ticker, stock_data=None):
+        """Bullet-point insights: what to watch, catalysts, risk flags.
+
+        Cached manually on success only, mirroring the async twin, so a
+        transient failure is never served from the cache.
+        """
+        key = hashkey(ticker)
+        with _CACHE_LOCK:
+            cached_result = _INSIGHTS_CACHE.get(key)
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None
+                          else self._get_stock_data(ticker))
+            stock_data.pop('price_history', None)
+            prompt = self._build_insights_prompt(stock_data, ticker)
+            result = {'ticker': ticker,
+                      'insights': self._chat_completion(prompt, max_tokens=500,
+                                                        temperature=0.6)}
+        except Exception as e:
+            return {'ticker': ticker, 'error': str(e)}
+        with _CACHE_LOCK:
+            _INSIGHTS_CACHE[key] = result
+        return result
+
+    async def aget_actionable_insights(self, ticker, stock_data=None):
+        """Async get_actionable_insights; shares the TTL cache."""
+        with _CACHE_LOCK:
+            cached_result = _INSIGHTS_CACHE.get(hashkey(ticker))
+        if cached_result is not None:
+            return cached_result
+        try:
+            stock_data = (dict(stock_data) if stock_data is not None else
+                          await asyncio.to_thread(self._get_stock_data, ticker))
+            stock_data.pop('price_history', None)
+            prompt = self._build_insights_prompt(stock_data, ticker)
+            result = {'ticker': ticker,
+                      'insights': await self._achat_completion(prompt, max_tokens=500,
+                                                               temperature=0.6)}
+        except Exception as e:
+            return {'ticker': ticker, 'error': str(e)}
+        with _CACHE_LOCK:
+            _INSIGHTS_CACHE[hashkey(ticker)] = result
+        return result
+
+    def analyze_companies_bulk(self, tickers, query='Rank these companies by growth'):
+        """Metrics for all tickers in parallel, then ONE comparison LLM call.
+
+        The interactive bulk path: instead of N narrative analyses plus a
+        ranking call, the batch metrics feed a single prompt.
+        """
+        companies = self.batch_ticker_metrics(tickers)
+        ranking = self.analyze_multiple_companies_llm(query, companies)
+        return {'companies': companies, 'ranking': ranking}
+
+    def submit_batch_analysis(self, tickers, jsonl_path='batch_requests.jsonl'):
+        """Offline path: submit per-company analyses via the OpenAI Batch API.
+
+        Batch requests cost half as much and amortize per-request overhead;
+        use for cron-style re-scans where nobody is waiting on the answer.
+        Returns the created batch object (poll it for results).
+        """
+        with open(jsonl_path, 'w') as f:
+            for ticker, data in zip(tickers, self._fetch_many(tickers)):
+                if data is None:
+                    continue
+                data.pop('price_history', None)
+                name = data.get('company_name', ticker)
+                prompt = self._build_analyze_prompt(data, ticker, name)
+                f.write(json.dumps({
+                    'custom_id': ticker,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': {'model': 'gpt-4',
+                             'messages': [{'role': 'user', 'content': prompt}],
+                             'max_tokens': 1500},
+                }) + '\n')
+
+        with open(jsonl_path, 'rb') as f:
+            batch_file = self.client.files.create(file=f, purpose='batch')
+        return self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h',
+        )
+
+    async def analyze_companies_batch(self, tickers, max_concurrent=10):
+        """Analyze many companies concurrently, bounded below rate limits."""
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def analyze(ticker):
+            async with semaphore:
+                return await self.aanalyze_company(ticker)
+
+        return list(await asyncio.gather(*(analyze(t) for t in tickers)))
+
+    def get_ticker_metrics(self, ticker):
+        """Numeric metrics (momentum, volatility, growth score) for one ticker."""
+        stock_data = self._get_stock_data(ticker, include_history=True)
+        price_history = stock_data.pop('price_history', None)
+        fundamentals = {
+            'revenue_growth': self._num(stock_data.get('revenue_growth')),
+            'market_cap': self._num(stock_data.get('market_cap')),
+            'avg_volume': self._num(stock_data.get('avg_volume')),
+            'profit_margins': self._num(stock_data.get('profit_margins')),
+        }
+        close, volume = self._history_arrays(price_history)
+        metrics = compute_metrics(close, volume, fundamentals)
+        metrics['ticker'] = ticker
+        metrics['company_name'] = stock_data.get('company_name', ticker)
+        return metrics
+
+    def batch_analyze_and_rank(self, tickers, query='Rank these companies by growth',
+                               companies=None):
+        """Per-company analyses plus the Top-3 ranking from exactly ONE LLM call.
+
+        Where a loop of analyze_company calls plus a comparison call pays for
+        N+1 completions, this folds every company's metric block into a single
+        JSON-mode prompt that returns both the short per-company analyses and
+        the ranking. Callers that already ran batch_ticker_metrics pass the
+        result in via companies to skip the refetch.
+        """
+        if companies is None:
+            companies = self.batch_ticker_metrics(tickers)
+        try:
+            prompt = self._build_comparison_prompt(
+                query, self._companies_summary(companies),
+                template=BATCH_ANALYZE_PROMPT_TEMPLATE)
+            ranking = self._parse_comparison_response(
+                self._chat_completion(prompt, max_tokens=2000, temperature=0.5,
+                                      model='gpt-4o-mini',
+                                      response_format={'type': 'json_object'}))
+        except Exception as e:
+            ranking = {'top_3_companies': [], 'error': str(e)}
+
+        # Fold the per-company analyses back onto the metrics dicts so the
+        # response shape matches the fan-out path.
+        analyses = {c.get('ticker'): c.get('analysis', '')
+                    for c in ranking.pop('companies', [])
+                    if isinstance(c, dict)}
+        for metrics in companies:
+            metrics['analysis'] = analyses.get(metrics.get('ticker'), '')
+        return {'query': query, 'companies': companies, 'ranking': ranking}
+
+    def full_analysis(self, ticker, company_name=None):
+        """Metrics plus all three LLM views of one ticker from a single fetch.
+
+        Fetches the stock data (with history) exactly once, derives the
+        numeric metrics from it, then threads the same dict through the three
+        LLM methods concurrently — one yfinance round-trip instead of the
+        three-plus the individual entry points would each pay.
+        """
+        stock_data = self._get_stock_data(ticker, include_history=True)
+        metrics = self.get_ticker_metrics(ticker)  # served by the cached fetch
+        stock_data.pop('price_history', None)
+
+        analysis_future = self._fetch_pool.submit(
+            self.analyze_company, ticker, company_name, stock_data=stock_data)
+        summary_future = self._fetch_pool.submit(
+            self.summarize_report, ticker, company_name, stock_data=stock_data)
+        insights_future = self._fetch_pool.submit(
+            self.get_actionable_insights, ticker, stock_data=stock_data)
+        return {
+            'ticker': ticker,
+            'metrics': metrics,
+            'analysis': analysis_future.result(),
+            'summary': summary_future.result(),
+            'insights': insights_future.result(),
+        }
+
+    def batch_ticker_metrics(self, tickers):
+        """Metrics for many tickers with one vectorized pass over all histories.
+
+        Replaces N get_ticker_metrics calls in /api/analyze-multiple: the
+        price math runs once over an (N, T) matrix instead of per ticker.
+        """
+        datas = [data or {'ticker': ticker, 'company_name': ticker}
+                 for ticker, data in zip(
+                     tickers, self._fetch_many(tickers, include_history=True))]
+
+        closes = [self._history_arrays(data.pop('price_history', None))[0]
+                  for data in datas]
+
+        results = batch_price_metrics(closes)
+        for data, metrics in zip(datas, results):
+            metrics.update(_compute_fundamental_metrics({
+                'revenue_growth': self._num(data.get('revenue_growth')),
+                'market_cap': self._num(data.get('market_cap')),
+                'avg_volume': self._num(data.get('avg_volume')),
+                'profit_margins': self._num(data.get('profit_margins')),
+            }))
+            metrics['growth_score'] = _compute_growth_score(metrics)
+            metrics['ticker'] = data.get('ticker')
+            metrics['company_name'] = data.get('company_name', metrics['ticker'])
+        return results
+
+    def _fetch_many(self, tickers, include_history=False):
+        """Fetch stock data for many tickers concurrently; failures become None."""
+        def fetch(ticker):
+            try:
+                return self._get_stock_data(ticker, include_history=include_history)
+            except Exception:
+                return None
+        return list(self._fetch_pool.map(fetch, tickers))
+
+    @staticmethod
+    def _num(value):
+        return value if isinstance(value, (int, float)) else 0.0
+
+    @staticmethod
+    def _history_arrays(price_history):
+        """Strip Close/Volume out of a history DataFrame as contiguous arrays.
+
+        Stored as float32: half the bytes per series, and well within
+        accuracy budget for percentage changes and a trend slope (the
+        kernels accumulate in float64 regardless).
+        """
+        empty = np.empty(0, dtype=np.float32)
+        if price_history is None or len(price_history) == 0:
+            return empty, empty
+        close = np.ascontiguousarray(
+            price_history['Close'].to_numpy(dtype=np.float32))
+        if 'Volume' in price_history:
+            volume = np.ascontiguousarray(
+                price_history['Volume'].to_numpy(dtype=np.float32))
+        else:
+            volume = empty
+        return close, volume
+
+    @cached(_UNIVERSE_CACHE, key=lambda self, limit=10: hashkey(limit),
+            lock=_CACHE_LOCK)
+    def discover_midcap_companies(self, limit=10):
+        """Scan a universe of candidate tickers for mid-caps ($2B-$10B)."""
+        # Fetch the whole universe at once (failures surface as None from
+        # _fetch_many), then filter in a single pass; the parallel fetch
+        # dwarfs the cost of the few extra tickers past the limit.
+        return [
+            {
+                'ticker': data['ticker'],
+                'company_name': data.get('company_name', data['ticker']),
+                'market_cap': data['market_cap'],
+                'sector': data.get('sector', 'N/A'),
+            }
+            for data in self._fetch_many(POTENTIAL_MIDCAP_TICKERS)
+            if data is not None
+            and isinstance(data.get('market_cap'), (int, float))
+            and 2e9 <= data['market_cap'] <= 10e9
+        ][:limit]
+
+    def scan_market_signals(self, sector=None):
+        """Score a sample of tickers for growth signals, strongest first."""
+        tickers = SAMPLE_TICKERS.get(sector) if sector else None
+        if tickers is None:
+            tickers = [t for group in SAMPLE_TICKERS.values() for t in group]
+
+        datas = [d for d in self._fetch_many(tickers) if d is not None]
+        if not datas:
+            return {'sector': sector or 'all', 'signals': []}
+
+        # Boolean-mask scoring in one vectorized expression instead of a
+        # per-ticker chain of isinstance/compare branches.
+        revenue_growth = np.array([self._num(d.get('revenue_growth')) for d in datas])
+        market_cap = np.array([self._num(d.get('market_cap')) for d in datas])
+        profit_margins = np.array([self._num(d.get('profit_margins')) for d in datas])
+        trending_up = np.array([d.get('recent_trend') == 'up' for d in datas])
+        scores = (30 * (revenue_growth > 0.2) + 20 * trending_up
+                  + 25 * ((market_cap > 2e9) & (market_cap < 50e9))
+                  + 25 * (profit_margins > 0.1))
+
+        signals = [
+            {
+                'ticker': data['ticker'],
+                'company_name': data.get('company_name', data['ticker']),
+                'signal_score': int(score),
+                'recent_trend': data.get('recent_trend'),
+                'market_cap': data.get('market_cap'),
+            }
+            for data, score in zip(datas, scores)
+        ]
+        signals.sort(key=lambda s: s['signal_score'], reverse=True)
+        return {'sector': sector or 'all', 'signals': signals[:10]}
+
+    @staticmethod
+    def _companies_summary(companies_data):
+        return [
+            {
+                'ticker': c.get('ticker'),
+                'company_name': c.get('company_name'),
+                'growth_score': c.get('growth_score'),
+                'weekly_change': c.get('weekly_change'),
+                'monthly_change': c.get('monthly_change'),
+                'market_cap': c.get('market_cap'),
+                'volatility': c.get('volatility'),
+            }
+            for c in companies_data
+        ]
+
+    @staticmethod
+    def _dump_summary(companies_summary):
+        # orjson also serializes the numpy scalars that leak out of the
+        # metrics dicts, so no default= fallback is needed.
+        return orjson.dumps(
+            companies_summary,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    @classmethod
+    def _build_comparison_prompt(cls, query, companies_summary,
+                                 template=COMPARISON_PROMPT_TEMPLATE):
+        """Build a multi-company prompt, trimmed to the model's token budget.
+
+        With a large batch the summary can push the prompt past the context
+        window, which fails only after the full round-trip. Over budget, the
+        lowest-growth-score entries are dropped (never below three — the
+        ranking needs a Top 3) and the prompt rebuilt.
+        """
+        prompt = template.format(
+            query=query, companies_json=cls._dump_summary(companies_summary))
+        if _count_tokens(prompt) <= _PROMPT_TOKEN_BUDGET:
+            return prompt
+        kept = sorted(companies_summary,
+                      key=lambda c: c.get('growth_score') or 0.0, reverse=True)
+        while len(kept) > 3:
+            kept.pop()
+            prompt = template.format(query=query,
+                                     companies_json=cls._dump_summary(kept))
+            if _count_tokens(prompt) <= _PROMPT_TOKEN_BUDGET:
+                break
+        return prompt
+
+    @staticmethod
+    def _parse_comparison_response(llm_response):
+        try:
+            return orjson.loads(llm_response)
+        except orjson.JSONDecodeError:
+            return {'top_3_companies': [], 'comparison_summary': '',
+                    'raw_response': llm_response}
+
+    def analyze_multiple_companies_llm(self, query, companies_data):
+        """One LLM call comparing all analyzed companies and picking a Top 3."""
+        try:
+            prompt = self._build_comparison_prompt(
+                query, self._companies_summary(companies_data))
+            # JSON mode guarantees a parseable body, and the ranking is easy
+            # enough that the mini model matches gpt-4 at a fraction of the
+            # latency; _parse_comparison_response stays as a defensive net.
+            return self._parse_comparison_response(
+                self._chat_completion(prompt, max_tokens=1000, temperature=0.4,
+                                      model='gpt-4o-mini',
+                                      response_format={'type': 'json_object'}))
+        except Exception as e:
+            return {'top_3_companies': [], 'error': str(e)}
+
+    async def aanalyze_multiple_companies_llm(self, query, companies_data):
+        """Async analyze_multiple_companies_llm for asyncio callers."""
+        try:
+            prompt = self._build_comparison_prompt(
+                query, self._companies_summary(companies_data))
+            return self._parse_comparison_response(
+                await self._achat_completion(
+                    prompt, max_tokens=1000, temperature=0.4,
+                    model='gpt-4o-mini',
+                    response_format={'type': 'json_object'}))
+        except Exception as e:
+            return {'top_3_companies': [], 'error': str(e)}
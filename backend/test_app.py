@@ -0,0 +1,205 @@
+"""Tests for the StockSherlok backend.
+
+sys.path setup and the (expensive) app import live in conftest.py so they
+run once per session rather than once per test module.
+"""
+
+import unittest
+from unittest.mock import DEFAULT, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from app import app
+from metrics_engine import (_compute_fundamental_metrics, _compute_growth_score,
+                            _compute_price_metrics, batch_price_metrics,
+                            compute_metrics)
+import chart_generator
+import research_agent
+
+# Shared, reproducibly-seeded price fixture. Built once at import with an
+# explicit Generator instead of per-test np.random.randn (global RandomState),
+# so repeated runs are deterministic and never hit a flaky noise draw.
+_RNG = np.random.default_rng(0)
+_FIXED_PRICES_150 = np.linspace(100, 120, 150) + _RNG.standard_normal(150) * 2
+# DatetimeIndex construction (freq validation etc.) is relatively pricey;
+# the tests never mutate it, so one shared index is safe to reuse.
+_DATES_150 = pd.date_range(start='2023-01-01', periods=150, freq='D')
+
+
+class TestAPIEndpoints(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # The client is stateless between requests, so one per class is
+        # enough - no need to rebuild the WSGI test machinery per test.
+        app.config['TESTING'] = True
+        cls.client = app.test_client()
+        # One patcher for all the agent methods these endpoints call,
+        # started once per class instead of re-entered by per-test
+        # decorators. No test below calls more than one of them, so the
+        # mocks' call records stay unambiguous across the class.
+        patcher = patch.multiple(
+            'research_agent.ResearchAgent',
+            analyze_company=DEFAULT, scan_market_signals=DEFAULT,
+            get_actionable_insights=DEFAULT)
+        cls.mocks = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def test_health(self):
+        response = self.client.get('/api/health')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], 'ok')
+
+    def test_analyze_endpoint(self):
+        mock_analyze = self.mocks['analyze_company']
+        mock_analyze.return_value = {'ticker': 'PLTR', 'analysis': 'Strong growth story.'}
+        response = self.client.post('/api/analyze', json={'ticker': 'PLTR'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['ticker'], 'PLTR')
+        mock_analyze.assert_called_once()
+
+    def test_analyze_missing_ticker(self):
+        response = self.client.post('/api/analyze', json={})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.get_json())
+
+    def test_scan_endpoint(self):
+        self.mocks['scan_market_signals'].return_value = {
+            'sector': 'technology', 'signals': []}
+        response = self.client.post('/api/scan', json={'sector': 'technology'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['sector'], 'technology')
+
+    def test_insights_endpoint(self):
+        self.mocks['get_actionable_insights'].return_value = {
+            'ticker': 'CRWD', 'insights': '- Watch Q3 revenue.'}
+        response = self.client.post('/api/insights', json={'ticker': 'CRWD'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('insights', response.get_json())
+
+
+class TestMetricsEngine(unittest.TestCase):
+
+    def test_compute_price_metrics_with_data(self):
+        metrics = _compute_price_metrics(_FIXED_PRICES_150)
+        self.assertIn('weekly_change', metrics)
+        self.assertIn('monthly_change', metrics)
+        self.assertIn('six_month_trend_slope', metrics)
+        self.assertIn('volatility', metrics)
+        self.assertGreater(metrics['six_month_trend_slope'], 0)
+
+    def test_compute_price_metrics_empty(self):
+        metrics = _compute_price_metrics(None)
+        self.assertEqual(metrics['weekly_change'], 0.0)
+        self.assertEqual(metrics['volatility'], 0.0)
+
+    def test_compute_fundamental_metrics(self):
+        fundamentals = {'revenue_growth': 0.35, 'market_cap': 5e9,
+                        'avg_volume': 2e6, 'profit_margins': 0.12}
+        metrics = _compute_fundamental_metrics(fundamentals)
+        self.assertEqual(metrics['revenue_growth_yoy'], 0.35)
+        self.assertEqual(metrics['market_cap'], 5e9)
+
+    def test_compute_growth_score_range(self):
+        metrics = {'weekly_change': 5.0, 'monthly_change': 12.0,
+                   'revenue_growth_yoy': 0.4, 'six_month_trend_slope': 0.2,
+                   'volatility': 3.0}
+        score = _compute_growth_score(metrics)
+        self.assertGreaterEqual(score, 0.0)
+        self.assertLessEqual(score, 10.0)
+
+    def test_batch_price_metrics_matches_single(self):
+        # Mixed history lengths: prices_c mimics a recent IPO with only 40
+        # rows, which must be measured over its own window, not padded to
+        # the 150-day series' length.
+        prices_a = np.linspace(100, 120, 150)
+        prices_b = np.linspace(50, 45, 150)
+        prices_c = np.linspace(30, 40, 40)
+        singles = [_compute_price_metrics(p)
+                   for p in (prices_a, prices_b, prices_c)]
+
+        batched = batch_price_metrics([prices_a, prices_b, prices_c])
+        for key in ('weekly_change', 'monthly_change', 'six_month_trend_slope',
+                    'volatility'):
+            for single, batch in zip(singles, batched):
+                self.assertAlmostEqual(batch[key], single[key], places=4)
+
+    def test_compute_metrics_full(self):
+        volumes = np.full(150, 2e6)
+        fundamentals = {'revenue_growth': 0.35, 'market_cap': 5e9,
+                        'avg_volume': 2e6, 'profit_margins': 0.12}
+
+        metrics = compute_metrics(_FIXED_PRICES_150, volumes, fundamentals)
+        self.assertIn('growth_score', metrics)
+        self.assertIn('revenue_growth_yoy', metrics)
+        self.assertIn('volatility', metrics)
+        self.assertAlmostEqual(metrics['avg_volume_30d'], 2e6)
+
+
+class TestChartGenerator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Select the headless backend and warm matplotlib's font cache once
+        # for the class; the first render pays the font-scanning cost, so
+        # individual tests measure chart code rather than matplotlib setup.
+        import matplotlib
+        matplotlib.use('Agg', force=True)
+        chart_generator.generate_bar_chart(['X'], [1.0], 'warmup')
+
+    def test_generate_bar_chart(self):
+        chart = chart_generator.generate_bar_chart(
+            ['PLTR', 'CRWD', 'DDOG'], [7.5, 6.2, 8.1], 'Growth Score', 'score')
+        self.assertEqual(chart['chart_type'], 'bar')
+        self.assertIn('image_base64', chart)
+        self.assertGreater(len(chart['image_base64']), 100)
+
+    def test_create_comparison_charts(self):
+        companies = [
+            {'ticker': 'PLTR', 'growth_score': 7.5, 'monthly_change': 12.0,
+             'market_cap': 5e9},
+            {'ticker': 'CRWD', 'growth_score': 6.2, 'monthly_change': -3.0,
+             'market_cap': 8e9},
+        ]
+        charts = chart_generator.create_comparison_charts(companies)
+        self.assertGreaterEqual(len(charts), 3)
+        for chart in charts:
+            self.assertIn('title', chart)
+
+
+class TestResearchAgent(unittest.TestCase):
+
+    @patch('research_agent.yf.Ticker')
+    def test_get_stock_data(self, mock_ticker):
+        instance = mock_ticker.return_value
+        instance.info = {'longName': 'Palantir Technologies', 'currentPrice': 25.0,
+                         'previousClose': 24.0, 'marketCap': 55e9,
+                         'sector': 'Technology', 'revenueGrowth': 0.2,
+                         'profitMargins': 0.15, 'averageVolume': 4e7}
+
+        agent = research_agent.ResearchAgent(api_key='test-key', client=MagicMock())
+        data = agent._get_stock_data('PLTR')
+        self.assertEqual(data['ticker'], 'PLTR')
+        self.assertEqual(data['company_name'], 'Palantir Technologies')
+        self.assertEqual(data['recent_trend'], 'up')
+        # The default (LLM prompt) path must not download price history.
+        instance.history.assert_not_called()
+
+    @patch('research_agent.yf.Ticker')
+    def test_get_ticker_metrics(self, mock_ticker):
+        instance = mock_ticker.return_value
+        instance.info = {'longName': 'CrowdStrike', 'marketCap': 8e9,
+                         'revenueGrowth': 0.3, 'averageVolume': 3e6,
+                         'profitMargins': 0.05}
+        instance.history.return_value = pd.DataFrame(
+            {'Close': np.linspace(100, 130, 150)}, index=_DATES_150)
+
+        agent = research_agent.ResearchAgent(api_key='test-key', client=MagicMock())
+        metrics = agent.get_ticker_metrics('CRWD')
+        self.assertEqual(metrics['ticker'], 'CRWD')
+        self.assertIn('growth_score', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Telnyx voice/SMS integration: call webhooks and outbound Sherlok alerts."""
+
+import hashlib
+
+import requests
+
+try:
+    import telnyx
+except ImportError:  # voice is optional; the web API works without it
+    telnyx = None
+
+
+class VoiceHandler:
+    """Handles Telnyx call-control webhooks and sends spoken/SMS summaries."""
+
+    def __init__(self, api_key=None, from_number=None, research_agent=None):
+        self.api_key = api_key
+        self.from_number = from_number
+        self.research_agent = research_agent
+        # Static per-call strings built once instead of on every webhook/SMS.
+        self._greeting = (
+            "Hello! I am Sherlok, your stock research detective. "
+            "Tell me a ticker symbol and I will investigate its growth "
+            "story for you. Remember, this is not financial advice.")
+        self._sms_template = "Sherlok Alert: {ticker}\n\n{summary}...".format
+        # Jump table of bound handlers: adding an event type is one entry
+        # here, and dispatch is a hash lookup instead of a compare chain.
+        self._dispatch = {
+            'call.initiated': self._handle_call_initiated,
+            'call.answered': self._handle_call_answered,
+            'call.hangup': self._handle_call_hangup,
+        }
+        if telnyx is not None and api_key:
+            telnyx.api_key = api_key
+            # One persistent HTTPS session for every Telnyx request; without
+            # it the SDK opens a fresh connection (TLS handshake included)
+            # per Call.create / speak / Message.create.
+            telnyx.default_http_client = telnyx.http_client.RequestsClient(
+                session=requests.Session())
+
+    @staticmethod
+    def _event_type(webhook_data):
+        """Event type from a webhook payload, or None if the shape is off."""
+        try:
+            return webhook_data['data']['event_type']
+        except (KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _ccid(webhook_data):
+        """call_control_id from a webhook payload, or None if the shape is off.
+
+        Direct indexing with an except clause instead of chained .get calls:
+        no throwaway default dicts on the hot path, and the accessor lives in
+        one place instead of being repeated in every handler.
+        """
+        try:
+            return webhook_data['data']['payload']['call_control_id']
+        except (KeyError, TypeError):
+            return None
+
+    def handle_webhook(self, webhook_data):
+        """Dispatch a Telnyx call-control webhook to the right handler."""
+        handler = self._dispatch.get(self._event_type(webhook_data),
+                                     self._handle_unknown)
+        return handler(webhook_data)
+
+    def _handle_unknown(self, webhook_data):
+        return {'status': 'ignored',
+                'event_type': self._event_type(webhook_data)}
+
+    def _handle_call_initiated(self, webhook_data):
+        call_control_id = self._ccid(webhook_data)
+        if telnyx is not None and call_control_id:
+            call = telnyx.Call()
+            call.call_control_id = call_control_id
+            call.answer()
+        return {'status': 'answered', 'call_control_id': call_control_id}
+
+    def _handle_call_answered(self, webhook_data):
+        call_control_id = self._ccid(webhook_data)
+        if telnyx is not None and call_control_id:
+            call = telnyx.Call()
+            call.call_control_id = call_control_id
+            call.speak(payload=self._greeting, voice='female', language='en-US')
+        return {'status': 'greeted', 'call_control_id': call_control_id}
+
+    def _handle_call_hangup(self, webhook_data):
+        call_control_id = self._ccid(webhook_data)
+        return {'status': 'hangup', 'call_control_id': call_control_id}
+
+    def make_outbound_call(self, to_number, ticker, summary):
+        """Call the user and read out a ticker summary."""
+        if telnyx is None or not self.api_key:
+            return {'error': 'Telnyx is not configured'}
+        # Keyed on the full logical request - recipient, ticker AND the
+        # summary being read - so a retried request (timeout, worker restart)
+        # never places the same call twice, while a later alert on the same
+        # ticker with a fresh summary still goes out.
+        call = telnyx.Call.create(
+            connection_id=self.api_key,
+            to=to_number,
+            from_=self.from_number,
+            idempotency_key=hashlib.md5(
+                f'{to_number}\x00{ticker}\x00{summary}'.encode()).hexdigest(),
+        )
+        call.speak(payload=f"Sherlok update on {ticker}. {summary}",
+                   voice='female', language='en-US')
+        return {'status': 'calling', 'to': to_number, 'ticker': ticker}
+
+    def send_sms_alert(self, to_number, ticker, summary):
+        """Text the user a truncated ticker summary."""
+        if telnyx is None or not self.api_key:
+            return {'error': 'Telnyx is not configured'}
+        message = self._sms_template(ticker=ticker, summary=summary[:140])
+        telnyx.Message.create(
+            from_=self.from_number,
+            to=to_number,
+            text=message,
+        )
+        return {'status': 'sent', 'to': to_number, 'ticker': ticker}
@@ -0,0 +1,67 @@
+"""Tiny on-disk TTL cache for the example API calls.
+
+The demo endpoints are dominated by remote LLM latency and their answers
+barely change between runs, so repeat invocations within the TTL are served
+from JSON files under examples/.cache/ in microseconds instead of seconds.
+"""
+
+import hashlib
+import json
+import time
+from functools import wraps
+from pathlib import Path
+
+DEFAULT_TTL = 3600
+
+
+class FileCache:
+    """JSON file cache keyed by endpoint + payload, with per-read TTL."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir or Path(__file__).parent / '.cache')
+        self.cache_dir.mkdir(exist_ok=True)
+
+    def _path(self, endpoint, payload):
+        key = hashlib.md5(
+            (endpoint + json.dumps(payload, sort_keys=True)).encode()).hexdigest()
+        return self.cache_dir / f'{key}.json'
+
+    def get(self, endpoint, payload, ttl=DEFAULT_TTL):
+        """Return the cached result, or None if absent/expired/corrupt."""
+        try:
+            with open(self._path(endpoint, payload)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('saved_at', 0) > ttl:
+            return None
+        return entry.get('result')
+
+    def set(self, endpoint, payload, result):
+        with open(self._path(endpoint, payload), 'w') as f:
+            json.dump({'saved_at': time.time(), 'result': result}, f)
+
+
+CACHE = FileCache()
+
+
+def cached(endpoint, ttl=DEFAULT_TTL):
+    """Serve repeat calls of a one-argument API helper from the file cache.
+
+    Only successful results (dicts without an 'error' key) are written, so a
+    transient backend failure never poisons the cache.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(value):
+            payload = {'value': value}
+            result = CACHE.get(endpoint, payload, ttl)
+            if result is not None:
+                print(f'--- {endpoint} for {value} (cached) ---')
+                return result
+            result = func(value)
+            if isinstance(result, dict) and 'error' not in result:
+                CACHE.set(endpoint, payload, result)
+            return result
+        return wrapper
+    return decorator
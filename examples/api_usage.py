@@ -0,0 +1,78 @@
+"""Example client for the StockSherlok backend API.
+
+Run the backend first (python backend/app.py), then: python examples/api_usage.py
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from _cache import cached
+
+BASE_URL = 'http://localhost:5000'
+
+# One session for every example call: keep-alive connections skip the
+# per-request TCP (and TLS, when fronted) setup.
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# LLM-backed endpoints can take a while; the health check should not.
+TIMEOUT = 60
+HEALTH_TIMEOUT = 5
+
+
+def check_health():
+    response = SESSION.get(f'{BASE_URL}/api/health', timeout=HEALTH_TIMEOUT)
+    print('Health:', response.json())
+    return response.ok
+
+
+@cached('/api/analyze')
+def analyze_company(ticker):
+    response = SESSION.post(f'{BASE_URL}/api/analyze', json={'ticker': ticker},
+                            timeout=TIMEOUT)
+    result = response.json()
+    print(f'--- Analysis for {ticker} ---')
+    print(result.get('analysis', result.get('error', 'no analysis')))
+    return result
+
+
+@cached('/api/scan')
+def scan_market(sector):
+    response = SESSION.post(f'{BASE_URL}/api/scan', json={'sector': sector},
+                            timeout=TIMEOUT)
+    result = response.json()
+    print(f'--- Signals for {sector} ---')
+    print(json.dumps(result.get('signals', []), indent=2))
+    return result
+
+
+@cached('/api/insights')
+def get_insights(ticker):
+    response = SESSION.post(f'{BASE_URL}/api/insights', json={'ticker': ticker},
+                            timeout=TIMEOUT)
+    result = response.json()
+    print(f'--- Insights for {ticker} ---')
+    print(result.get('insights', result.get('error', 'no insights')))
+    return result
+
+
+def main():
+    if not check_health():
+        print('Backend is not running on', BASE_URL)
+        return
+    # The three demo calls are independent and each waits on an LLM-backed
+    # endpoint, so run them concurrently: wall time is the slowest call
+    # rather than the sum of all three.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(analyze_company, 'PLTR'),
+                   pool.submit(scan_market, 'technology'),
+                   pool.submit(get_insights, 'PLTR')]
+        for future in futures:
+            future.result()
+
+
+if __name__ == '__main__':
+    main()
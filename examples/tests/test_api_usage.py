@@ -0,0 +1,72 @@
+"""Tests for the example API client: pre-baked responses, no backend process."""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _cache
+import api_usage
+
+
+def _response(payload, ok=True):
+    response = MagicMock()
+    response.ok = ok
+    response.json.return_value = payload
+    return response
+
+
+class TestApiUsage(unittest.TestCase):
+
+    def setUp(self):
+        # Point the file cache at a throwaway directory so tests neither
+        # read stale demo entries nor leave any behind.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.object(_cache, 'CACHE', _cache.FileCache(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(api_usage, 'SESSION')
+    def test_check_health(self, mock_session):
+        mock_session.get.return_value = _response({'status': 'ok'})
+        self.assertTrue(api_usage.check_health())
+        mock_session.get.assert_called_once()
+
+    @patch.object(api_usage, 'SESSION')
+    def test_analyze_company(self, mock_session):
+        mock_session.post.return_value = _response(
+            {'ticker': 'PLTR', 'analysis': 'Strong growth story.'})
+        result = api_usage.analyze_company('PLTR')
+        self.assertEqual(result['ticker'], 'PLTR')
+        mock_session.post.assert_called_once()
+
+    @patch.object(api_usage, 'SESSION')
+    def test_analyze_company_second_call_is_cached(self, mock_session):
+        mock_session.post.return_value = _response(
+            {'ticker': 'PLTR', 'analysis': 'Strong growth story.'})
+        first = api_usage.analyze_company('PLTR')
+        second = api_usage.analyze_company('PLTR')
+        self.assertEqual(first, second)
+        mock_session.post.assert_called_once()
+
+    @patch.object(api_usage, 'SESSION')
+    def test_scan_market(self, mock_session):
+        mock_session.post.return_value = _response(
+            {'sector': 'technology', 'signals': [{'ticker': 'PLTR'}]})
+        result = api_usage.scan_market('technology')
+        self.assertEqual(result['sector'], 'technology')
+
+    @patch.object(api_usage, 'SESSION')
+    def test_get_insights(self, mock_session):
+        mock_session.post.return_value = _response(
+            {'ticker': 'CRWD', 'insights': '- Watch Q3 revenue.'})
+        result = api_usage.get_insights('CRWD')
+        self.assertIn('insights', result)
+
+
+if __name__ == '__main__':
+    unittest.main()